@@ -1,21 +1,68 @@
+import logging
+import os
+import numpy as np
 import pandas as pd
-from datetime import datetime, timezone, timedelta
-from typing import List, Dict
+from datetime import datetime, time, timezone, timedelta
+from functools import lru_cache
+from typing import List, Dict, NamedTuple, Optional
 from .config import (
     WARM_THRESHOLD,
     SUNNY_THRESHOLD,
     WINDY_THRESHOLD,
     WEATHER_DATA_FILEPATH,
 )
+from .kernels import best_forecast, evaluate_day
+
+logger = logging.getLogger(__name__)
+
+SENSORS = ("temperature", "irradiance", "wind speed")
+SENSOR_DTYPE = pd.CategoricalDtype(SENSORS)
+
+# Columns read from the CSV; declaring the dtypes up front skips type inference
+CSV_DTYPES = {
+    "belief_horizon_in_sec": "int32",
+    "event_value": "float64",
+    "sensor": SENSOR_DTYPE,
+}
+CSV_COLUMNS = ["event_start", *CSV_DTYPES]
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NS_MIN = int(np.iinfo(np.int64).min)
+NS_MAX = int(np.iinfo(np.int64).max)
+
+# Parquet caches are only reused if they were written for the same columns and dtypes
+CACHE_SCHEMA_KEY = b"weather_data_schema"
+CACHE_SCHEMA = repr((CSV_COLUMNS, CSV_DTYPES)).encode()
+
+
+class SensorArrays(NamedTuple):
+    """Read-only columns of one sensor's forecasts, sorted by 'event_start'."""
+
+    event_start: np.ndarray  # int64 UTC nanoseconds
+    available_at: np.ndarray  # int64 UTC nanoseconds
+    belief_horizon: np.ndarray  # int64 seconds
+    event_value: np.ndarray  # float64
 
 
 def load_weather_data(filepath: str = WEATHER_DATA_FILEPATH) -> pd.DataFrame:
     """
     Load weather data from a CSV file into a pandas DataFrame.
 
-    This function reads a CSV file specified by the `filepath` parameter,
-    parses the 'event_start' column as datetime. The 'event_start'
-    column is then converted to UTC timezone.
+    The first load reads the `CSV_COLUMNS` of the CSV file specified by the
+    `filepath` parameter with their `CSV_DTYPES`, using the multithreaded
+    PyArrow CSV reader. It decodes the 'event_start' column natively as a
+    UTC timestamp and stores 'sensor' as a categorical with the codes of
+    `SENSORS` (other sensors become NaN).
+    If PyArrow is not installed, it falls back to the pandas C engine and
+    parses 'event_start' afterwards. The 'event_start' column is then
+    normalized to UTC, an 'available_at' column is added and the rows are
+    sorted by sensor and 'event_start'.
+
+    The result is cached as a Parquet file next to the CSV (same name,
+    '.parquet' extension), which later loads (including other server
+    workers) read directly for as long as it is newer than
+    the CSV and was written for the current `CSV_COLUMNS` and `CSV_DTYPES`.
+    Outdated or unreadable caches are rebuilt from the CSV.
 
     Args:
         filepath (str): The path to the CSV file containing the weather data.
@@ -23,70 +70,268 @@ def load_weather_data(filepath: str = WEATHER_DATA_FILEPATH) -> pd.DataFrame:
     Returns:
         pd.DataFrame: A pandas DataFrame containing the loaded weather data.
     """
-    # Load CSV into a DataFrame with parsed datetime for 'event_start'
-    df = pd.read_csv(
-        filepath,
+    parquet_path = os.path.splitext(filepath)[0] + ".parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(
+        parquet_path
+    ) >= os.path.getmtime(filepath):
+        df = _read_parquet_cache(parquet_path)
+        if df is not None:
+            return df
+
+    try:
+        # PyArrow infers 'event_start' as a timestamp while reading
+        df = pd.read_csv(
+            filepath, engine="pyarrow", usecols=CSV_COLUMNS, dtype=CSV_DTYPES
+        )
+    except ImportError:
+        df = pd.read_csv(
+            filepath,
+            engine="c",
+            usecols=CSV_COLUMNS,
+            dtype=CSV_DTYPES,
+            low_memory=False,
+        )
+        df["event_start"] = pd.to_datetime(df["event_start"], errors="coerce")
+
+    df = _add_available_at(df).sort_values(
+        ["sensor", "event_start"], kind="stable", ignore_index=True
     )
-    df["event_start"] = pd.to_datetime(df["event_start"], errors="coerce")
+
+    _write_parquet_cache(df, parquet_path)
 
     return df
 
 
-def get_forecasts(df: pd.DataFrame, now: datetime, then: datetime) -> List[Dict]:
+def _read_parquet_cache(parquet_path: str) -> Optional[pd.DataFrame]:
     """
-    Get the three most recent forecasts for temperature, irradiance, and wind speed.
+    Read the Parquet cache written by `_write_parquet_cache`.
+
+    Parameters:
+        parquet_path (str): The path of the Parquet cache.
+
+    Returns:
+        Optional[pd.DataFrame]: The cached weather data, or None if PyArrow is not
+        installed, the file cannot be read or it was written for another schema.
+    """
+    try:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(parquet_path)
+    except ImportError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable weather data cache %s: %s", parquet_path, e)
+        return None
+
+    if (table.schema.metadata or {}).get(CACHE_SCHEMA_KEY) != CACHE_SCHEMA:
+        logger.info("Rebuilding outdated weather data cache %s", parquet_path)
+        return None
+    return table.to_pandas()
+
+
+def _write_parquet_cache(df: pd.DataFrame, parquet_path: str) -> None:
+    """
+    Cache loaded weather data as Parquet, tagged with `CACHE_SCHEMA`.
+
+    The data is written to a per-process temporary file and renamed into
+    place, so workers starting concurrently never read a partially written
+    cache. Failures are logged and otherwise ignored.
+
+    Parameters:
+        df (pd.DataFrame): The loaded weather data.
+        parquet_path (str): The path of the Parquet cache.
+    """
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**table.schema.metadata, CACHE_SCHEMA_KEY: CACHE_SCHEMA}
+        )
+        pq.write_table(
+            table, tmp_path, row_group_size=1_000_000, use_dictionary=["sensor"]
+        )
+        os.replace(tmp_path, parquet_path)
+    except (ImportError, OSError) as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        logger.warning("Could not cache weather data as %s: %s", parquet_path, e)
+
+
+def _add_available_at(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize 'event_start' to UTC and add an 'available_at' column.
+
+    'available_at' is the moment a forecast became known, i.e. 'event_start'
+    minus 'belief_horizon_in_sec', computed with int64 nanosecond
+    arithmetic. Computing it once here spares every request a full-column
+    timedelta allocation. Frames that already carry
+    the column are returned unchanged.
 
     Parameters:
         df (pd.DataFrame): DataFrame containing weather data.
-        now (datetime): The current datetime (must be UTC).
-        then (datetime): The datetime up to which forecasts are considered.
 
     Returns:
-        List[Dict[str, float]]: A list containing a dictionary with the most recent forecasts for each sensor.
+        pd.DataFrame: The DataFrame with UTC 'event_start' and 'available_at' columns.
+    """
+    if "available_at" in df.columns:
+        return df
 
-    Notes:
-        - If no data is available for a sensor, its value is set to -1.0.
+    df = df.copy()
+    event_start = pd.to_datetime(df["event_start"], errors="coerce")
+    if event_start.dt.tz is None:
+        event_start = event_start.dt.tz_localize("UTC")
+    else:
+        event_start = event_start.dt.tz_convert("UTC")
+    df["event_start"] = event_start.dt.as_unit("ns")
+
+    # Subtract on int64 views, reusing the horizon buffer instead of building timedelta arrays
+    event_start_ns = df["event_start"].values
+    horizon_ns = df["belief_horizon_in_sec"].to_numpy(np.int64) * np.int64(
+        1_000_000_000
+    )
+    available_at = np.subtract(event_start_ns.view("i8"), horizon_ns, out=horizon_ns)
+    available_at[np.isnat(event_start_ns)] = np.iinfo(np.int64).min  # NaT stays NaT
+    df["available_at"] = pd.Series(
+        available_at.view("datetime64[ns]"), index=df.index
+    ).dt.tz_localize("UTC")
+
+    return df
+
+
+def _to_nanoseconds(dt: datetime) -> int:
     """
-    # Ensure 'now' and 'then' are timezone-aware
-    now = now if now.tzinfo else now.replace(tzinfo=timezone.utc)
-    then = then if then.tzinfo else then.replace(tzinfo=timezone.utc)
+    Convert a datetime to UTC nanoseconds since the epoch, clipped to the int64 range.
 
-    # Define sensors of interest and default forecast values
-    sensors = {"temperature", "irradiance", "wind speed"}
-    default_forecast = {"temperature": -1.0, "irradiance": -1.0, "wind_speed": -1.0}
+    Stored timestamps always lie within that range (about 1677 to 2262), so
+    clipping earlier or later moments keeps every comparison against them
+    correct. Naive datetimes are treated as UTC.
+    """
+    dt = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    ns = (dt - EPOCH) // timedelta(microseconds=1) * 1000
+    return min(max(ns, NS_MIN), NS_MAX)
+
+
+def build_sensor_arrays(df: pd.DataFrame) -> Dict[str, SensorArrays]:
+    """
+    Split weather data into contiguous, read-only NumPy arrays per sensor.
 
-    # Filter the data for the time range up to 'then' and relevant sensors
-    filtered_data = df[(df["event_start"] <= then) & (df["sensor"].isin(sensors))]
+    Building the arrays once at startup lets request handlers slice a time
+    window with a binary search and hand plain arrays to the kernels,
+    without touching pandas on the request path.
 
-    # Filter forecasts that were made available by 'now'
-    filtered_data = filtered_data[
-        (
-            filtered_data["event_start"]
-            - pd.to_timedelta(filtered_data["belief_horizon_in_sec"], unit="s")
+    Parameters:
+        df (pd.DataFrame): DataFrame containing weather data.
+
+    Returns:
+        Dict[str, SensorArrays]: The arrays of each sensor in `SENSORS`, sorted by
+        'event_start' (ties keep file order). Rows without a valid 'event_start'
+        are dropped.
+    """
+    df = _add_available_at(df).dropna(subset=["event_start"])
+    sensor_codes = df["sensor"].astype(SENSOR_DTYPE).cat.codes.to_numpy()
+
+    sensor_arrays = {}
+    for code, sensor in enumerate(SENSORS):
+        sub = df[sensor_codes == code].sort_values("event_start", kind="stable")
+        columns = SensorArrays(
+            event_start=np.ascontiguousarray(sub["event_start"].values.view("i8")),
+            available_at=np.ascontiguousarray(sub["available_at"].values.view("i8")),
+            belief_horizon=np.ascontiguousarray(
+                sub["belief_horizon_in_sec"].to_numpy(np.int64)
+            ),
+            event_value=np.ascontiguousarray(sub["event_value"].to_numpy(np.float64)),
         )
-        <= now
-    ]
+        for column in columns:
+            column.flags.writeable = False
+        sensor_arrays[sensor] = columns
 
-    # For each sensor, select the forecast with the smallest belief horizon for 'then'
-    most_recent_forecasts = (
-        filtered_data.sort_values(
-            by=["sensor", "event_start", "belief_horizon_in_sec"],
-            ascending=[True, False, True],
+    return sensor_arrays
+
+
+@lru_cache(maxsize=1)
+def get_weather_data(filepath: str = WEATHER_DATA_FILEPATH) -> Dict[str, SensorArrays]:
+    """
+    Load the weather data as per-sensor arrays once per process.
+
+    Repeated calls, e.g. from a module that gets imported twice, return the
+    already built arrays instead of parsing the data again. The loaded
+    DataFrame is released once the arrays are built, so only one copy of
+    the data stays in memory.
+
+    Args:
+        filepath (str): The path to the CSV file containing the weather data.
+
+    Returns:
+        Dict[str, SensorArrays]: The arrays built from the loaded weather data by
+        `build_sensor_arrays`.
+    """
+    return build_sensor_arrays(load_weather_data(filepath))
+
+
+def get_forecast_values(
+    sensor_arrays: Dict[str, SensorArrays], now: datetime, then: datetime
+) -> np.ndarray:
+    """
+    Get the most recent forecast value of each sensor as a NumPy array.
+
+    Parameters:
+        sensor_arrays (Dict[str, SensorArrays]): Per-sensor arrays as returned by
+            `build_sensor_arrays`.
+        now (datetime): The current datetime (must be UTC).
+        then (datetime): The datetime up to which forecasts are considered.
+
+    Returns:
+        np.ndarray: The forecast values in the order of `SENSORS` (float64),
+        with -1.0 for sensors without data.
+    """
+    # Compare as int64 UTC nanoseconds; naive 'now' and 'then' are treated as UTC
+    then_ns = _to_nanoseconds(then)
+    now_ns = _to_nanoseconds(now)
+
+    values = np.empty(len(SENSORS), dtype=np.float64)
+    for i, sensor in enumerate(SENSORS):
+        arrays = sensor_arrays[sensor]
+
+        # Only events up to 'then' can qualify; the kernel filters on 'now' and picks the best
+        hi = arrays.event_start.searchsorted(then_ns, side="right")
+        values[i] = best_forecast(
+            arrays.event_start[:hi],
+            arrays.available_at[:hi],
+            arrays.belief_horizon[:hi],
+            arrays.event_value[:hi],
+            then_ns,
+            now_ns,
         )
-        .groupby("sensor")
-        .first()
-    )
 
-    # Convert to dictionary and rename sensors
-    forecast_values = {
-        key.replace(" ", "_"): value
-        for key, value in most_recent_forecasts["event_value"].to_dict().items()
-    }
+    return values
+
+
+def get_forecasts(df: pd.DataFrame, now: datetime, then: datetime) -> List[Dict]:
+    """
+    Get the three most recent forecasts for temperature, irradiance, and wind speed.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing weather data.
+        now (datetime): The current datetime (must be UTC).
+        then (datetime): The datetime up to which forecasts are considered.
 
-    # Update default forecast with available values
-    forecasts = {**default_forecast, **forecast_values}
+    Returns:
+        List[Dict[str, float]]: A list containing a dictionary with the most recent forecasts for each sensor.
 
-    return [forecasts]
+    Notes:
+        - If no data is available for a sensor, its value is set to -1.0.
+        - Builds the sensor arrays on every call; services answering many requests
+          should build them once and use `get_forecast_values`.
+    """
+    temperature, irradiance, wind_speed = get_forecast_values(
+        build_sensor_arrays(df), now, then
+    ).tolist()
+    return [
+        {"temperature": temperature, "irradiance": irradiance, "wind_speed": wind_speed}
+    ]
 
 
 def evaluate_tomorrow(df: pd.DataFrame, now: datetime) -> dict:
@@ -101,6 +346,28 @@ def evaluate_tomorrow(df: pd.DataFrame, now: datetime) -> dict:
         dict: A dictionary with keys "warm", "sunny", and "windy" indicating whether
               the conditions are met for tomorrow based on predefined thresholds.
 
+    Notes:
+        - Builds the sensor arrays on every call; services answering many requests
+          should build them once and use `evaluate_tomorrow_conditions`.
+    """
+    return evaluate_tomorrow_conditions(build_sensor_arrays(df), now)
+
+
+def evaluate_tomorrow_conditions(
+    sensor_arrays: Dict[str, SensorArrays], now: datetime
+) -> dict:
+    """
+    Determine from per-sensor arrays if tomorrow is 'warm', 'sunny', and 'windy'.
+
+    Parameters:
+        sensor_arrays (Dict[str, SensorArrays]): Per-sensor arrays as returned by
+            `build_sensor_arrays`.
+        now (datetime): The current datetime (must be UTC).
+
+    Returns:
+        dict: A dictionary with keys "warm", "sunny", and "windy" indicating whether
+              the conditions are met for tomorrow based on predefined thresholds.
+
     Notes:
         - Thresholds are defined for each condition.
         - Returns False if no data is available.
@@ -108,50 +375,43 @@ def evaluate_tomorrow(df: pd.DataFrame, now: datetime) -> dict:
     # Ensure 'now' is timezone-aware
     now = now if now.tzinfo else now.replace(tzinfo=timezone.utc)
 
-    # If the DataFrame is empty, return default conditions
-    if df.empty:
+    # Determine tomorrow's date and its [start, end) window as clipped int64 UTC nanoseconds
+    try:
+        tomorrow_date = (now + timedelta(days=1)).date()
+        day_start = datetime.combine(tomorrow_date, time.min, tzinfo=timezone.utc)
+        day_end = day_start + timedelta(days=1)
+    except OverflowError:
+        # Tomorrow ends beyond datetime.max, long after any stored forecast
         return {"warm": False, "sunny": False, "windy": False}
+    day_bounds = np.array(
+        [_to_nanoseconds(day_start), _to_nanoseconds(day_end)], dtype=np.int64
+    )
 
-    # Determine tomorrow's date and filter forecasts for that date
-    tomorrow_date = (now + timedelta(days=1)).date()
-    tomorrow_forecasts = df[df["event_start"].dt.date == tomorrow_date]
-
-    # Debugging information to confirm filtering
-    print("Evaluating for tomorrow's date:", tomorrow_date)
-    print("Filtered forecasts for tomorrow:", tomorrow_forecasts)
+    # Slice tomorrow's forecast values per sensor type
+    tomorrow_values = {}
+    for sensor in SENSORS:
+        arrays = sensor_arrays[sensor]
+        lo, hi = arrays.event_start.searchsorted(day_bounds)
+        tomorrow_values[sensor] = arrays.event_value[lo:hi]
+    temperature_values = tomorrow_values["temperature"]
+    irradiance_values = tomorrow_values["irradiance"]
+    wind_speed_values = tomorrow_values["wind speed"]
 
-    # Separate forecasts by sensor type for tomorrow
-    temperature_forecasts = tomorrow_forecasts[
-        tomorrow_forecasts["sensor"] == "temperature"
-    ]
-    irradiance_forecasts = tomorrow_forecasts[
-        tomorrow_forecasts["sensor"] == "irradiance"
-    ]
-    wind_speed_forecasts = tomorrow_forecasts[
-        tomorrow_forecasts["sensor"] == "wind speed"
-    ]
-
-    # Evaluate conditions based on thresholds
-    warm = (
-        any(temperature_forecasts["event_value"] >= WARM_THRESHOLD)
-        if not temperature_forecasts.empty
-        else False
-    )
-    sunny = (
-        any(irradiance_forecasts["event_value"] >= SUNNY_THRESHOLD)
-        if not irradiance_forecasts.empty
-        else False
-    )
-    windy = (
-        any(wind_speed_forecasts["event_value"] >= WINDY_THRESHOLD)
-        if not wind_speed_forecasts.empty
-        else False
+    # Evaluate conditions based on thresholds in one branchless pass
+    warm, sunny, windy = evaluate_day(
+        temperature_values,
+        irradiance_values,
+        wind_speed_values,
+        WARM_THRESHOLD,
+        SUNNY_THRESHOLD,
+        WINDY_THRESHOLD,
     )
 
-    # Debugging outputs to check conditions
-    print("Temperature forecasts for tomorrow:", temperature_forecasts)
-    print("Irradiance forecasts for tomorrow:", irradiance_forecasts)
-    print("Wind speed forecasts for tomorrow:", wind_speed_forecasts)
-    print("Result - Warm:", warm, "Sunny:", sunny, "Windy:", windy)
+    # Debugging outputs to check conditions; formatting the values is skipped unless enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Evaluating for tomorrow's date: %s", tomorrow_date)
+        for sensor, values in tomorrow_values.items():
+            logger.debug("%s forecasts for tomorrow: %s", sensor.capitalize(), values)
+        logger.debug("Result - Warm: %s Sunny: %s Windy: %s", warm, sunny, windy)
 
     return {"warm": warm, "sunny": sunny, "windy": windy}
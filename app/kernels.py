@@ -0,0 +1,88 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def best_forecast(
+    event_start: np.ndarray,
+    available_at: np.ndarray,
+    belief_horizon: np.ndarray,
+    event_value: np.ndarray,
+    then_ns: int,
+    now_ns: int,
+) -> float:
+    """
+    Find the value of the most recent forecast known at `now_ns` for an event up to `then_ns`.
+
+    Parameters:
+        event_start (np.ndarray): Event start times as int64 nanoseconds since the epoch (UTC).
+        available_at (np.ndarray): Times the forecasts became available, as int64 nanoseconds.
+        belief_horizon (np.ndarray): Belief horizons in seconds (int64).
+        event_value (np.ndarray): Forecasted values (float64).
+        then_ns (int): Latest event start to consider, in nanoseconds.
+        now_ns (int): Latest availability time to consider, in nanoseconds.
+
+    Returns:
+        float: The value of the forecast with the latest event start, preferring the
+        smallest belief horizon (first row on ties), or -1.0 if no forecast qualifies.
+    """
+    found = False
+    best_start = 0
+    best_horizon = 0
+    best_value = -1.0
+    for i in range(event_start.shape[0]):
+        if event_start[i] > then_ns or available_at[i] > now_ns:
+            continue
+        if (
+            not found
+            or event_start[i] > best_start
+            or (event_start[i] == best_start and belief_horizon[i] < best_horizon)
+        ):
+            found = True
+            best_start = event_start[i]
+            best_horizon = belief_horizon[i]
+            best_value = event_value[i]
+    return best_value
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def evaluate_day(
+    temperature: np.ndarray,
+    irradiance: np.ndarray,
+    wind_speed: np.ndarray,
+    warm_threshold: float,
+    sunny_threshold: float,
+    windy_threshold: float,
+) -> tuple:
+    """
+    Check whether any forecast of a day reaches the warm, sunny and windy thresholds.
+
+    Parameters:
+        temperature (np.ndarray): Temperature forecasts for the day (float64).
+        irradiance (np.ndarray): Irradiance forecasts for the day (float64).
+        wind_speed (np.ndarray): Wind speed forecasts for the day (float64).
+        warm_threshold (float): Minimum temperature for a warm day.
+        sunny_threshold (float): Minimum irradiance for a sunny day.
+        windy_threshold (float): Minimum wind speed for a windy day.
+
+    Returns:
+        tuple: (warm, sunny, windy) booleans; False for sensors without forecasts.
+    """
+    # OR-accumulate without early exits so LLVM can vectorize the comparisons
+    warm = False
+    for i in range(temperature.shape[0]):
+        warm |= temperature[i] >= warm_threshold
+    sunny = False
+    for i in range(irradiance.shape[0]):
+        sunny |= irradiance[i] >= sunny_threshold
+    windy = False
+    for i in range(wind_speed.shape[0]):
+        windy |= wind_speed[i] >= windy_threshold
+    return warm, sunny, windy
+
+
+# Compile (or load from the on-disk cache) at import rather than on the first request
+_one_int = np.zeros(1, dtype=np.int64)
+_one_float = np.zeros(1, dtype=np.float64)
+best_forecast(_one_int, _one_int, _one_int, _one_float, 0, 0)
+evaluate_day(_one_float, _one_float, _one_float, 0.0, 0.0, 0.0)
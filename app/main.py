@@ -1,15 +1,75 @@
+from ciso8601 import parse_datetime
 from fastapi import FastAPI, HTTPException, Query
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import List
 from .schemas import ForecastResponse
-from .data_handler import load_weather_data, get_forecasts, evaluate_tomorrow
+from .data_handler import (
+    get_weather_data,
+    get_forecast_values,
+    evaluate_tomorrow_conditions,
+)
 
 app = FastAPI(title="Seita Weather Forecast API")
-weather_df = load_weather_data()
+SENSOR_ARRAYS = get_weather_data()
+
+
+def _parse_utc_datetime(value: str, name: str) -> datetime:
+    """
+    Parse an ISO 8601 query parameter with ciso8601 and ensure it is in UTC.
+
+    Naive datetimes are taken to be in UTC.
+
+    Raises:
+        HTTPException: 422 if `value` is not an ISO 8601 datetime,
+                       400 if it has a non-UTC offset.
+    """
+    try:
+        dt = parse_datetime(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=422, detail=f"`{name}` is not a valid ISO 8601 datetime."
+        ) from None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    if dt.utcoffset() != timedelta(0):
+        raise HTTPException(status_code=400, detail=f"`{name}` must be in UTC.")
+    return dt
+
+
+@lru_cache(maxsize=4096)
+def _cached_forecasts(now: datetime, then: datetime) -> List[ForecastResponse]:
+    """
+    Memoize the forecast response per (`now`, `then`) pair.
+
+    The weather data is loaded once and never changes while the process runs,
+    so repeated queries for the same moments can reuse earlier results. The
+    response is built with `model_construct`, as the kernel output needs no
+    validation.
+    """
+    temperature, irradiance, wind_speed = get_forecast_values(
+        SENSOR_ARRAYS, now, then
+    ).tolist()
+    return [
+        ForecastResponse.model_construct(
+            temperature=temperature, irradiance=irradiance, wind_speed=wind_speed
+        )
+    ]
 
 
 @app.get("/forecasts", response_model=List[ForecastResponse])
-async def get_forecasts_endpoint(now: datetime, then: datetime):
+def get_forecasts_endpoint(
+    now: str = Query(
+        ...,
+        description="ISO 8601 datetime in UTC.",
+        json_schema_extra={"format": "date-time"},
+    ),
+    then: str = Query(
+        ...,
+        description="ISO 8601 datetime in UTC.",
+        json_schema_extra={"format": "date-time"},
+    ),
+):
     """
     Get the three most recent forecasts for temperature, irradiance, and wind speed.
 
@@ -19,24 +79,26 @@ async def get_forecasts_endpoint(now: datetime, then: datetime):
                            - "belief_horizon_in_sec" (int): How long ago (in seconds) the forecast was made.
                            - "event_value" (float): The forecasted value.
                            - "sensor" (str): The type of sensor data ("temperature", "irradiance", "wind speed").
-        now (datetime): The datetime when the forecast is requested (must be UTC).
-        then (datetime): The datetime for which forecasts are considered.
+        now (str): The ISO 8601 datetime when the forecast is requested (must be UTC).
+        then (str): The ISO 8601 datetime for which forecasts are considered (must be UTC).
 
     Returns:
         List[Dict[str, float]]: A dictionary with the most recent forecasted values for each sensor.
 
     Raises:
-        HTTPException: If input data is missing or in an incorrect format.
+        HTTPException: If input data is missing, in an incorrect format or not in UTC.
 
     Notes:
         - If no data is available for a specific sensor, the function will return -1.0 for that sensor.
         - The function filters for only relevant sensor types ("temperature", "irradiance", "wind speed").
     """
+    now = _parse_utc_datetime(now, "now")
+    then = _parse_utc_datetime(then, "then")
     if now < then:
         raise HTTPException(
             status_code=400, detail="`now` should not be earlier than `then`."
         )
-    forecasts = get_forecasts(weather_df, now, then)
+    forecasts = _cached_forecasts(now, then)
     if not forecasts:
         raise HTTPException(
             status_code=404,
@@ -46,7 +108,13 @@ async def get_forecasts_endpoint(now: datetime, then: datetime):
 
 
 @app.get("/tomorrow", response_model=dict)
-async def get_tomorrow(now: datetime):
+def get_tomorrow(
+    now: str = Query(
+        ...,
+        description="ISO 8601 datetime in UTC.",
+        json_schema_extra={"format": "date-time"},
+    ),
+):
     """
     Determines if tomorrow is expected to meet "warm", "sunny", and "windy" conditions.
 
@@ -55,7 +123,7 @@ async def get_tomorrow(now: datetime):
                            - "event_start" (datetime): The datetime of the forecasted event.
                            - "event_value" (float): The forecasted value.
                            - "sensor" (str): The type of sensor data ("temperature", "irradiance", "wind speed").
-        now (datetime): The datetime to calculate tomorrow's date (must be UTC).
+        now (str): The ISO 8601 datetime to calculate tomorrow's date (must be UTC).
 
     Returns:
         dict: A dictionary with Boolean keys indicating if conditions are met:
@@ -64,11 +132,12 @@ async def get_tomorrow(now: datetime):
               - "windy": True if wind speed meets the windy threshold.
 
     Raises:
-        HTTPException: If input data is missing or in an incorrect format.
+        HTTPException: If input data is missing, in an incorrect format or not in UTC.
 
     Notes:
         - Thresholds for each condition can be adjusted based on requirements.
         - Function returns False for a condition if no relevant data is available.
     """
-    tomorrow_conditions = evaluate_tomorrow(weather_df, now)
+    now = _parse_utc_datetime(now, "now")
+    tomorrow_conditions = evaluate_tomorrow_conditions(SENSOR_ARRAYS, now)
     return tomorrow_conditions
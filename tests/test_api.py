@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import pandas as pd
+from fastapi.testclient import TestClient
 from app.data_handler import get_forecasts, load_weather_data, evaluate_tomorrow
 
 global WARM_THRESHOLD, SUNNY_THRESHOLD, WINDY_THRESHOLD
@@ -68,6 +71,55 @@ class TestWeatherAPI(unittest.TestCase):
         # Assert that the result matches the expected result
         self.assertEqual(result, expected_result)
 
+    def test_get_forecasts_outside_nanosecond_range(self):
+        # Moments outside the int64 nanosecond range (~1677 to ~2262) must not wrap around
+        far_future = datetime(2300, 1, 1, tzinfo=timezone.utc)
+        self.assertEqual(
+            get_forecasts(self.df, far_future, self.then),
+            [{"temperature": 8.97, "irradiance": 0.0, "wind_speed": 6.17}],
+        )
+
+        long_ago = datetime(1600, 1, 1, tzinfo=timezone.utc)
+        self.assertEqual(
+            get_forecasts(self.df, long_ago + timedelta(days=1), long_ago),
+            [{"temperature": -1.0, "irradiance": -1.0, "wind_speed": -1.0}],
+        )
+
+    def test_get_forecasts_not_yet_available(self):
+        # The latest event is only forecast at 20:00, after 'now', so the older event is used
+        df = pd.DataFrame(
+            {
+                "event_start": [
+                    datetime(2020, 11, 3, 18, 0, tzinfo=timezone.utc),
+                    datetime(2020, 11, 3, 17, 0, tzinfo=timezone.utc),
+                ],
+                "belief_horizon_in_sec": [-7200, 3600],
+                "event_value": [99.0, 5.0],
+                "sensor": ["temperature", "temperature"],
+            }
+        )
+        expected_result = [{"temperature": 5.0, "irradiance": -1.0, "wind_speed": -1.0}]
+
+        result = get_forecasts(df, self.now, self.then)
+
+        self.assertEqual(result, expected_result)
+
+    def test_get_forecasts_smallest_belief_horizon(self):
+        # Same event forecast several times: the smallest horizon wins, the first row on ties
+        df = pd.DataFrame(
+            {
+                "event_start": [datetime(2020, 11, 3, 18, 0, tzinfo=timezone.utc)] * 3,
+                "belief_horizon_in_sec": [7200, 3600, 3600],
+                "event_value": [1.0, 2.0, 3.0],
+                "sensor": ["irradiance", "irradiance", "irradiance"],
+            }
+        )
+        expected_result = [{"temperature": -1.0, "irradiance": 2.0, "wind_speed": -1.0}]
+
+        result = get_forecasts(df, self.now, self.then)
+
+        self.assertEqual(result, expected_result)
+
     def test_evaluate_tomorrow(self):
         WARM_THRESHOLD = 8.0
         SUNNY_THRESHOLD = 50.0
@@ -91,6 +143,29 @@ class TestWeatherAPI(unittest.TestCase):
         # Assert that the result matches the expected result
         self.assertEqual(result, expected_result)
 
+    def test_evaluate_tomorrow_outside_nanosecond_range(self):
+        # Days outside the int64 nanosecond range (~1677 to ~2262) hold no forecasts;
+        # the rows below sit where those days used to wrap around to
+        df = pd.DataFrame(
+            {
+                "event_start": [
+                    datetime(2184, 7, 22, 0, 0, tzinfo=timezone.utc),
+                    datetime(1715, 6, 14, 12, 0, tzinfo=timezone.utc),
+                ]
+                * 3,
+                "belief_horizon_in_sec": [3600] * 6,
+                "event_value": [1000.0] * 6,
+                "sensor": ["temperature"] * 2 + ["irradiance"] * 2 + ["wind speed"] * 2,
+            }
+        )
+        expected_result = {"warm": False, "sunny": False, "windy": False}
+        for now in (
+            datetime(1600, 1, 1, tzinfo=timezone.utc),
+            datetime(2300, 1, 1, tzinfo=timezone.utc),
+            datetime(9999, 12, 31, tzinfo=timezone.utc),
+        ):
+            self.assertEqual(evaluate_tomorrow(df, now), expected_result)
+
     def test_evaluate_tomorrow_not_sunny(self):
         # Modify data to ensure irradiance is below threshold
         self.df.loc[self.df["sensor"] == "irradiance", "event_value"] = 40.0
@@ -115,6 +190,136 @@ class TestWeatherAPI(unittest.TestCase):
         # Assert that the result matches the expected result
         self.assertEqual(result, expected_result)
 
+    def test_load_weather_data_parquet_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "weather.csv")
+            self.df.assign(unit="-").to_csv(csv_path, index=False)
+
+            # The first load reads the CSV and writes the Parquet cache
+            from_csv = load_weather_data(csv_path)
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, "weather.parquet")))
+
+            # The second load reads the cache and returns the same data
+            from_parquet = load_weather_data(csv_path)
+            pd.testing.assert_frame_equal(from_csv, from_parquet)
+            self.assertEqual(
+                get_forecasts(from_parquet, self.now, self.then),
+                [{"temperature": 8.97, "irradiance": 0.0, "wind_speed": 6.17}],
+            )
+
+    def test_load_weather_data_corrupt_parquet_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "weather.csv")
+            parquet_path = os.path.join(tmpdir, "weather.parquet")
+            self.df.assign(unit="-").to_csv(csv_path, index=False)
+            expected = load_weather_data(csv_path)
+
+            # An unreadable cache falls back to the CSV and is rewritten
+            with open(parquet_path, "wb") as f:
+                f.write(b"not a parquet file")
+            pd.testing.assert_frame_equal(load_weather_data(csv_path), expected)
+            pd.testing.assert_frame_equal(pd.read_parquet(parquet_path), expected)
+
+    def test_load_weather_data_outdated_parquet_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "weather.csv")
+            self.df.assign(unit="-").to_csv(csv_path, index=False)
+
+            # A cache written before the column selection, with every column and an int64 horizon
+            self.df.assign(unit="-").to_parquet(
+                os.path.join(tmpdir, "weather.parquet"), index=False
+            )
+
+            for _ in range(2):  # rebuilt from the CSV, then read from the new cache
+                df = load_weather_data(csv_path)
+                self.assertNotIn("unit", df.columns)
+                self.assertEqual(df["belief_horizon_in_sec"].dtype, "int32")
+
+
+class TestEndpoints(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Importing the app loads the bundled weather data
+        from app import main
+
+        cls.main = main
+        cls.client = TestClient(main.app)
+
+    def test_naive_datetimes_are_utc(self):
+        naive = self.client.get(
+            "/forecasts", params={"now": "2021-01-01T12:00:00", "then": "2021-01-01"}
+        )
+        utc = self.client.get(
+            "/forecasts",
+            params={"now": "2021-01-01T12:00:00Z", "then": "2021-01-01T00:00:00+00:00"},
+        )
+        self.assertEqual(naive.status_code, 200)
+        self.assertEqual(naive.json(), utc.json())
+
+        naive = self.client.get("/tomorrow", params={"now": "2021-01-01T12:00:00"})
+        utc = self.client.get("/tomorrow", params={"now": "2021-01-01T12:00:00Z"})
+        self.assertEqual(naive.status_code, 200)
+        self.assertEqual(naive.json(), utc.json())
+
+    def test_non_utc_offset_is_rejected(self):
+        response = self.client.get(
+            "/forecasts",
+            params={"now": "2021-01-01T12:00:00+01:00", "then": "2021-01-01T00:00:00Z"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "`now` must be in UTC."})
+
+        response = self.client.get(
+            "/tomorrow", params={"now": "2021-01-01T12:00:00-05:00"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "`now` must be in UTC."})
+
+    def test_invalid_datetime_is_rejected(self):
+        # Unix timestamps were accepted by pydantic's parser but are not ISO 8601
+        for value in ("not a date", "1604426400"):
+            response = self.client.get(
+                "/forecasts", params={"now": "2021-01-01T12:00:00Z", "then": value}
+            )
+            self.assertEqual(response.status_code, 422)
+            self.assertEqual(
+                response.json(),
+                {"detail": "`then` is not a valid ISO 8601 datetime."},
+            )
+
+            response = self.client.get("/tomorrow", params={"now": value})
+            self.assertEqual(response.status_code, 422)
+            self.assertEqual(
+                response.json(),
+                {"detail": "`now` is not a valid ISO 8601 datetime."},
+            )
+
+    def test_forecasts_are_cached(self):
+        self.main._cached_forecasts.cache_clear()
+        params = {"now": "2021-01-01T12:00:00Z", "then": "2021-01-01T00:00:00Z"}
+
+        first = self.client.get("/forecasts", params=params)
+        second = self.client.get("/forecasts", params=params)
+
+        self.assertEqual(first.json(), second.json())
+        cache_info = self.main._cached_forecasts.cache_info()
+        self.assertEqual((cache_info.misses, cache_info.hits), (1, 1))
+
+    def test_forecasts_cache_keys_on_instant(self):
+        # A naive and an explicit-UTC 'now' for the same instant share one entry
+        self.main._cached_forecasts.cache_clear()
+        for now in ("2021-01-01T12:00:00", "2021-01-01T12:00:00+00:00"):
+            self.client.get("/forecasts", params={"now": now, "then": "2021-01-01"})
+
+        cache_info = self.main._cached_forecasts.cache_info()
+        self.assertEqual((cache_info.currsize, cache_info.hits), (1, 1))
+
+    def test_openapi_documents_date_time_format(self):
+        paths = self.client.get("/openapi.json").json()["paths"]
+        for path in ("/forecasts", "/tomorrow"):
+            for parameter in paths[path]["get"]["parameters"]:
+                self.assertEqual(parameter["schema"]["format"], "date-time")
+
 
 if __name__ == "__main__":
     unittest.main()